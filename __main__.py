@@ -11,6 +11,8 @@ class Pipeline(Enum):
     """Create an enumerator to choose which pipeline to run."""
 
     KF = auto()
+    KF_PARALLEL = auto()
+    KF_SWEEP = auto()
     EKF = auto()
     SLAM = auto()
     CONTROLLER = auto()
@@ -34,6 +36,10 @@ if __name__ == "__main__":  # pragma: no cover
 
     if pipeline_id == Pipeline.KF.name:
         subprocess.run(["python", "examples/kf_example.py"], check=True)
+    elif pipeline_id == Pipeline.KF_PARALLEL.name:
+        subprocess.run(["python", "examples/kf_example.py", "--parallel"], check=True)
+    elif pipeline_id == Pipeline.KF_SWEEP.name:
+        subprocess.run(["python", "examples/kf_example.py", "--sweep"], check=True)
     elif pipeline_id == Pipeline.EKF.name:
         subprocess.run(["python", "examples/ekf_localization_example.py"], check=False)
     elif pipeline_id == Pipeline.SLAM.name:
@@ -25,12 +25,61 @@ class Feature:
 
 
 class Map:
-    """Dataclass to store features for a map."""
+    """Store map features as parallel arrays of ids and positions."""
 
     def __init__(self, features: Optional[list[Feature]] = None):
         if features is None:
             features = []
-        self.features = features
+        self.ids: np.ndarray = np.array([f.id for f in features], dtype=int)
+        self.xs: np.ndarray = np.array([f.x for f in features], dtype=float)
+        self.ys: np.ndarray = np.array([f.y for f in features], dtype=float)
+        self.zs: np.ndarray = np.array([f.z for f in features], dtype=float)
+        self._past_feature_ids: set[int] = {f.id for f in features}
+
+    @classmethod
+    def from_arrays(
+        cls,
+        ids: np.ndarray,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray] = None,
+    ) -> "Map":
+        """Create a map from feature arrays whose ids are already unique.
+
+        :param ids: Unique feature ids
+        :param xs: Feature x positions
+        :param ys: Feature y positions
+        :param zs: Feature z positions, zero if not given
+        :return: A map holding the features
+        """
+        new_map = cls()
+        new_map.ids = np.asarray(ids, dtype=int)
+        new_map.xs = np.asarray(xs, dtype=float)
+        new_map.ys = np.asarray(ys, dtype=float)
+        new_map.zs = np.zeros(len(ids)) if zs is None else np.asarray(zs, dtype=float)
+        new_map._past_feature_ids = set(new_map.ids.tolist())
+        return new_map
+
+    def __len__(self) -> int:
+        """Return the number of features in the map."""
+        return len(self.ids)
+
+    @property
+    def features(self) -> list[Feature]:
+        """Return the features as a list of Feature objects."""
+        return [
+            Feature(id=int(idx), x=float(x), y=float(y), z=float(z))
+            for idx, x, y, z in zip(self.ids, self.xs, self.ys, self.zs, strict=True)
+        ]
+
+    @property
+    def past_feature_ids(self) -> list[int]:
+        """Return the ids of every feature seen so far in ascending order."""
+        return sorted(self._past_feature_ids)
+
+    def features_xyz(self) -> np.ndarray:
+        """Return the feature positions as an N-by-3 matrix."""
+        return np.column_stack((self.xs, self.ys, self.zs))
 
     def append_feature(self, feature: Feature) -> None:
         """Append a feature to the map.
@@ -38,11 +87,51 @@ class Map:
         :param feature: Feature to be appended
         :return: None
         """
-        if self.feature_already_found(feature):
-            logger.warning(f"Revisited landmark with I.D. {feature.id}.")
-        else:
-            self.features.append(feature)
-            logger.info(f"Added landmark with I.D. {feature.id}.")
+        self.add_features(
+            ids=np.array([feature.id]),
+            xs=np.array([feature.x]),
+            ys=np.array([feature.y]),
+            zs=np.array([feature.z]),
+        )
+
+    def add_features(
+        self,
+        ids: np.ndarray,
+        xs: np.ndarray,
+        ys: np.ndarray,
+        zs: Optional[np.ndarray] = None,
+    ) -> None:
+        """Append several features to the map at once.
+
+        :param ids: Feature ids
+        :param xs: Feature x positions
+        :param ys: Feature y positions
+        :param zs: Feature z positions, zero if not given
+        :return: None
+        """
+        if zs is None:
+            zs = np.zeros(len(ids))
+
+        is_new = np.zeros(len(ids), dtype=bool)
+        for ii, feature_id in enumerate(ids.tolist()):
+            if feature_id not in self._past_feature_ids:
+                is_new[ii] = True
+                self._past_feature_ids.add(feature_id)
+
+        # one line per batch, only formatted if the level is enabled
+        if not np.all(is_new):
+            logger.opt(lazy=True).warning(
+                "Revisited landmarks with I.D.s {}.", ids[~is_new].tolist
+            )
+        if np.any(is_new):
+            logger.opt(lazy=True).info(
+                "Added landmarks with I.D.s {}.", ids[is_new].tolist
+            )
+
+        self.ids = np.concatenate((self.ids, ids[is_new]))
+        self.xs = np.concatenate((self.xs, xs[is_new]))
+        self.ys = np.concatenate((self.ys, ys[is_new]))
+        self.zs = np.concatenate((self.zs, zs[is_new]))
 
     def feature_already_found(self, new_feature: Feature) -> bool:
         """Check if the feature already exists.
@@ -50,8 +139,7 @@ class Map:
         :param new_feature: Feature to check
         :return: True if the feature already exists, False otherwise
         """
-        ids = [feature.id for feature in self.features]
-        return new_feature.id in ids
+        return new_feature.id in self._past_feature_ids
 
     def update_feature_location(self, feature: Feature) -> None:
         """Update the location of a feature.
@@ -59,9 +147,9 @@ class Map:
         :param feature: Feature to update
         :return: None
         """
-        idx = [feature.id for feature in self.features].index(feature.id)
-        self.features[idx].x = feature.x
-        self.features[idx].y = feature.y
+        idx = np.flatnonzero(self.ids == feature.id)[0]
+        self.xs[idx] = feature.x
+        self.ys[idx] = feature.y
 
 
 def make_random_map_planar(
@@ -73,15 +161,12 @@ def make_random_map_planar(
     :param dim: Dimensions of the map
     :return: A map with random features
     """
-    new_map = Map()
-    for num in range(num_features):
-        map_feature = Feature(
-            id=num,
-            x=np.random.uniform(0, dim[0]),
-            y=np.random.uniform(0, dim[1]),
-            z=0.0,
-        )
-        new_map.append_feature(map_feature)
+    new_map = Map.from_arrays(
+        ids=np.arange(num_features),
+        xs=np.random.uniform(0, dim[0], num_features),
+        ys=np.random.uniform(0, dim[1], num_features),
+    )
+    logger.info(f"Added {num_features} landmarks.")
     return new_map
 
 
@@ -94,27 +179,28 @@ def make_box_map_planar(
     :param dim: Dimensions of the map
     :return: A map with random features
     """
-    new_map = Map()
-
-    num_features = 4 * round(num_features / 4)
-
-    for num in range(0, int(num_features / 4)):
-        x = np.random.uniform(0, dim[0])
-        map_feature = Feature(id=num, x=x, y=0)
-        new_map.append_feature(map_feature)
-    for num in range(int(num_features / 4), int(num_features / 2)):
-        y = np.random.uniform(0, dim[1])
-        map_feature = Feature(id=num, x=dim[0], y=y)
-        new_map.append_feature(map_feature)
-    for num in range(int(num_features / 2), int(3 * num_features / 4)):
-        x = np.random.uniform(0, dim[0])
-        map_feature = Feature(id=num, x=x, y=dim[1])
-        new_map.append_feature(map_feature)
-    for num in range(int(3 * num_features / 4), num_features):
-        y = np.random.uniform(0, dim[1])
-        map_feature = Feature(id=num, x=0, y=y)
-        new_map.append_feature(map_feature)
-
+    side = round(num_features / 4)
+    num_features = 4 * side
+
+    # walk the sides in order: bottom, right, top, left
+    xs = np.concatenate(
+        (
+            np.random.uniform(0, dim[0], side),
+            np.full(side, dim[0]),
+            np.random.uniform(0, dim[0], side),
+            np.zeros(side),
+        )
+    )
+    ys = np.concatenate(
+        (
+            np.zeros(side),
+            np.random.uniform(0, dim[1], side),
+            np.full(side, dim[1]),
+            np.random.uniform(0, dim[1], side),
+        )
+    )
+    new_map = Map.from_arrays(ids=np.arange(num_features), xs=xs, ys=ys)
+    logger.info(f"Added {num_features} landmarks.")
     return new_map
 
 
@@ -122,6 +122,39 @@ def measure_distance_azimuth_elevation(
     return np.reshape(merged, (len(merged), 1))
 
 
+def jacobian_distance_azimuth_elevation(
+    state: np.ndarray, features_xyz: np.ndarray
+) -> np.ndarray:
+    """Calculate the stacked measurement Jacobian for a set of features.
+
+    The rows follow the (distance, azimuth, elevation) interleaving used by
+    measure_distance_azimuth_elevation.
+
+    :param state: the current state vector
+    :param features_xyz: the feature positions as an N-by-3 matrix
+    :return: the 3N-by-6 Jacobian with respect to the pose
+    """
+    pose = state_to_se3(state)
+    dx = features_xyz[:, 0] - pose.x
+    dy = features_xyz[:, 1] - pose.y
+    dz = features_xyz[:, 2] - pose.z
+    distance = np.sqrt(dx**2 + dy**2 + dz**2)
+    range_xy = dx**2 + dy**2
+    range_xz = dx**2 + dz**2
+
+    jacobian = np.zeros((len(features_xyz), 3, 6))
+    jacobian[:, 0, 0] = -dx / distance
+    jacobian[:, 0, 1] = -dy / distance
+    jacobian[:, 0, 2] = -dz / distance
+    jacobian[:, 1, 0] = dy / range_xy
+    jacobian[:, 1, 1] = -dx / range_xy
+    jacobian[:, 1, 5] = -1.0
+    jacobian[:, 2, 0] = dz / range_xz
+    jacobian[:, 2, 2] = -dx / range_xz
+    jacobian[:, 2, 5] = -1.0
+    return jacobian.reshape((3 * len(features_xyz), 6))
+
+
 def step_dynamics(state_control: np.ndarray, dt: float = DELTA_T) -> np.ndarray:
     """Define the equations of motion.
 
@@ -17,7 +17,7 @@ class PoseMap:
 
     def as_vector(self) -> np.ndarray:
         """Return the state data as a vector."""
-        vector = np.zeros((3 + 2 * len(self.map.features), 1))
+        vector = np.zeros((3 + 2 * len(self.map), 1))
         return vector
 
     def from_vector(self, ekf_state: np.ndarray) -> None:
@@ -13,11 +13,53 @@ from config.definitions import FIG_SIZE, LEGEND_LOC, PLOT_ALPHA, PLOT_MARKER_SIZ
 class StateHistory:
     """A state history object to store history of state information."""
 
-    time: list[float] = field(default_factory=list)
-    state: list[np.ndarray] = field(default_factory=list)
-    state_true: list[np.ndarray] = field(default_factory=list)
-    control: list[np.ndarray] = field(default_factory=list)
-    covariance: list[np.ndarray] = field(default_factory=list)
+    time: list[float] | np.ndarray = field(default_factory=list)
+    state: list[np.ndarray] | np.ndarray = field(default_factory=list)
+    state_true: list[np.ndarray] | np.ndarray = field(default_factory=list)
+    control: list[np.ndarray] | np.ndarray = field(default_factory=list)
+    covariance: list[np.ndarray] | np.ndarray = field(default_factory=list)
+    state_smoothed: list[np.ndarray] | np.ndarray = field(default_factory=list)
+
+    @classmethod
+    def preallocate(
+        cls, num_steps: int, num_states: int, num_inputs: int
+    ) -> "StateHistory":
+        """Create a history backed by arrays sized for a known number of steps.
+
+        Steps that are never set, and optional data that set_step is not given,
+        are left as NaN so they are not mistaken for recorded values.
+
+        :param num_steps: Number of time steps to store
+        :param num_states: Dimension of the state vector
+        :param num_inputs: Dimension of the control vector
+        :return: State history object to be filled with set_step
+        """
+        return cls(
+            time=np.full(num_steps, np.nan),
+            state=np.full((num_steps, num_states, 1), np.nan),
+            state_true=np.full((num_steps, num_states, 1), np.nan),
+            control=np.full((num_steps, num_inputs, 1), np.nan),
+            covariance=np.full((num_steps, num_states, num_states), np.nan),
+        )
+
+    def set_step(  # noqa: PLR0913
+        self,
+        idx: int,
+        t: float,
+        x: np.ndarray,
+        x_truth: Optional[np.ndarray] = None,
+        cov: Optional[np.ndarray] = None,
+        u: Optional[np.ndarray] = None,
+    ) -> None:
+        """Store state data at a given step of a preallocated history."""
+        self.time[idx] = t
+        self.state[idx] = x
+        if u is not None:
+            self.control[idx] = u
+        if cov is not None:
+            self.covariance[idx] = cov
+        if x_truth is not None:
+            self.state_true[idx] = x_truth
 
     def append_step(
         self,
@@ -38,6 +80,48 @@ class StateHistory:
             self.state_true.append(x_truth)
 
 
+def _is_recorded(values: list[np.ndarray] | np.ndarray) -> bool:
+    """Check whether any values were stored in a history field.
+
+    :param values: History field, either a list or a NaN-filled array
+    :return: True if at least one value was recorded
+    """
+    return len(values) > 0 and not np.all(np.isnan(np.asarray(values)))
+
+
+def _plot_overlay(  # noqa: PLR0913
+    ax: plt.Axes,
+    history: StateHistory,
+    overlay: list[np.ndarray] | np.ndarray,
+    num_state: int,
+    fmt: str,
+    label: str,
+    color: str,
+) -> None:  # pragma: no cover
+    """Plot one state of a secondary trajectory if it was recorded.
+
+    :param ax: Axis to plot on
+    :param history: State history object holding the time stamps
+    :param overlay: Trajectory to plot, skipped if empty
+    :param num_state: Index of the state to plot
+    :param fmt: Matplotlib format string
+    :param label: Legend label
+    :param color: Line color
+    :return: None
+    """
+    if not _is_recorded(overlay):
+        return
+    ax.plot(
+        history.time,
+        np.asarray(overlay)[:, num_state].flatten(),
+        fmt,
+        label=label,
+        alpha=PLOT_ALPHA,
+        color=color,
+        markersize=PLOT_MARKER_SIZE,
+    )
+
+
 def plot_history(
     history: StateHistory, title: str = "State Space History"
 ) -> None:  # pragma: no cover
@@ -67,7 +151,7 @@ def plot_history(
 
     for ii, ax in enumerate(axs):
         for num_state in range(num_states):
-            data = np.array([arr[num_state] for arr in history.state]).flatten()
+            data = np.asarray(history.state)[:, num_state].flatten()
 
             if ii == 1:
                 data /= np.amax(np.abs(data))
@@ -75,31 +159,33 @@ def plot_history(
             p = ax.plot(
                 history.time, data, "--", label=f"$x_{num_state}$", alpha=PLOT_ALPHA
             )
-            if len(history.covariance) > 0:
+            if _is_recorded(history.covariance):
                 _add_bounds(
                     state=num_state,
-                    sigma=np.array(
-                        [arr[num_state, num_state] for arr in history.covariance]
-                    ),
+                    sigma=np.asarray(history.covariance)[:, num_state, num_state],
                     color=p[0].get_color(),
                 )
             ax.set_ylabel("State" if ii == 0 else "Normalized State")
 
-            # plot the ground truth if it exists
-            if len(history.state_true) > 0:
-                c = p[0].get_color()
-                data = np.array(
-                    [arr[num_state] for arr in history.state_true]
-                ).flatten()
-                ax.plot(
-                    history.time,
-                    data,
-                    ".",
-                    label=f"$x_{num_state} (true)$",
-                    alpha=PLOT_ALPHA,
-                    color=c,
-                    markersize=PLOT_MARKER_SIZE,
-                )
+            # plot the ground truth and smoothed estimate if they exist
+            _plot_overlay(
+                ax=ax,
+                history=history,
+                overlay=history.state_true,
+                num_state=num_state,
+                fmt=".",
+                label=f"$x_{num_state} (true)$",
+                color=p[0].get_color(),
+            )
+            _plot_overlay(
+                ax=ax,
+                history=history,
+                overlay=history.state_smoothed,
+                num_state=num_state,
+                fmt="-",
+                label=f"$x_{num_state} (smoothed)$",
+                color=p[0].get_color(),
+            )
         for u in range(history.control[0].shape[1]):
             control = [arr[u] for arr in history.control]
             if ii == 1:
@@ -1,24 +1,223 @@
 """Basic docstring for my module."""
 
-from typing import Optional
+from typing import Callable, Optional
 
 import numpy as np
+from loguru import logger
+from numba import njit
+from scipy.linalg import solve_discrete_are
 
 from config.definitions import MEASUREMENT_NOISE, PROCESS_NOISE
-from ekf_slam_3d.modules.math_utils import symmetrize_matrix
+from ekf_slam_3d.modules.math_utils import (
+    Elements,
+    parallel_scan,
+    symmetrize_matrices,
+    symmetrize_matrix,
+)
 from ekf_slam_3d.modules.state_space import StateSpaceLinear
 
 
+@njit(cache=True)
+def _kf_predict(  # noqa: PLR0913
+    x: np.ndarray,
+    cov: np.ndarray,
+    A: np.ndarray,
+    B: np.ndarray,
+    Q: np.ndarray,
+    u: np.ndarray,
+    has_control: bool,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Propagate the state estimate and error covariance by one step.
+
+    :param x: State estimate
+    :param cov: Error covariance
+    :param A: State transition matrix
+    :param B: Control input matrix
+    :param Q: Process noise covariance
+    :param u: Control input
+    :param has_control: Whether to add the control input, B @ u is skipped if not
+    :return: Predicted state estimate and error covariance
+    """
+    x = A @ x + B @ u if has_control else A @ x
+    AP = A @ cov
+    cov = AP @ A.T + Q
+    return x, (cov + cov.T) / 2
+
+
+def _nonzero_entries(matrix: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Split a matrix into the row indices, column indices, and values of its nonzeros.
+
+    :param matrix: Matrix to split
+    :return: Row indices, column indices, and values of the nonzero entries
+    """
+    rows, cols = np.nonzero(matrix)
+    return rows, cols, np.ascontiguousarray(matrix[rows, cols])
+
+
+def _make_predict_step(  # noqa: C901
+    A: np.ndarray, B: np.ndarray, Q: np.ndarray
+) -> Callable:
+    """Compile a predict step specialized to the sparsity of the model matrices.
+
+    The closure only loops over the nonzero entries of A, B, and Q, which are
+    found once here, so sparse or structured models skip every product with a
+    zero entry instead of relying on the compiler to fold them.
+
+    :param A: State transition matrix
+    :param B: Control input matrix
+    :param Q: Process noise covariance
+    :return: Compiled function mapping (x, cov, u, has_control) to the
+        predicted (x, cov)
+    """
+    a_rows, a_cols, a_vals = _nonzero_entries(A)
+    b_rows, b_cols, b_vals = _nonzero_entries(B)
+    q_rows, q_cols, q_vals = _nonzero_entries((Q + Q.T) / 2)
+    num_states = A.shape[0]
+
+    @njit
+    def predict_step(  # noqa: C901
+        x: np.ndarray, cov: np.ndarray, u: np.ndarray, has_control: bool
+    ) -> tuple[np.ndarray, np.ndarray]:
+        x_next = np.zeros_like(x)
+        for idx in range(len(a_vals)):
+            x_next[a_rows[idx], 0] += a_vals[idx] * x[a_cols[idx], 0]
+        if has_control:
+            for idx in range(len(b_vals)):
+                x_next[b_rows[idx], 0] += b_vals[idx] * u[b_cols[idx], 0]
+
+        AP = np.zeros_like(cov)
+        for idx in range(len(a_vals)):
+            for jj in range(num_states):
+                AP[a_rows[idx], jj] += a_vals[idx] * cov[a_cols[idx], jj]
+
+        # only the upper triangle is computed, which also symmetrizes the result
+        cov_next = np.zeros_like(cov)
+        for idx in range(len(q_vals)):
+            if q_rows[idx] <= q_cols[idx]:
+                cov_next[q_rows[idx], q_cols[idx]] = q_vals[idx]
+        for idx in range(len(a_vals)):
+            jj, kk = a_rows[idx], a_cols[idx]
+            for ii in range(jj + 1):
+                cov_next[ii, jj] += AP[ii, kk] * a_vals[idx]
+        for ii in range(num_states):
+            for jj in range(ii + 1, num_states):
+                cov_next[jj, ii] = cov_next[ii, jj]
+        return x_next, cov_next
+
+    return predict_step
+
+
+@njit(cache=True)
+def _kalman_gain(PCt: np.ndarray, S: np.ndarray, K: np.ndarray) -> None:
+    """Write the Kalman gain into K, inverting small S in closed form.
+
+    A singular S raises LinAlgError in every branch, as np.linalg.solve does.
+
+    :param PCt: Error covariance times the transposed observation matrix
+    :param S: Innovation covariance
+    :param K: Kalman gain buffer to fill
+    :return: None
+    """
+    if S.shape[0] == 1:
+        if S[0, 0] == 0.0:
+            raise np.linalg.LinAlgError("Innovation covariance is singular.")
+        inv_s = 1.0 / S[0, 0]
+        for ii in range(K.shape[0]):
+            K[ii, 0] = PCt[ii, 0] * inv_s
+    elif S.shape[0] == 2:
+        det = S[0, 0] * S[1, 1] - S[0, 1] * S[1, 0]
+        if det == 0.0:
+            raise np.linalg.LinAlgError("Innovation covariance is singular.")
+        inv_det = 1.0 / det
+        i00, i01 = S[1, 1] * inv_det, -S[0, 1] * inv_det
+        i10, i11 = -S[1, 0] * inv_det, S[0, 0] * inv_det
+        for ii in range(K.shape[0]):
+            K[ii, 0] = PCt[ii, 0] * i00 + PCt[ii, 1] * i10
+            K[ii, 1] = PCt[ii, 0] * i01 + PCt[ii, 1] * i11
+    else:
+        K[:] = np.linalg.solve(S.T, PCt.T).T
+
+
+@njit(cache=True)
+def _kf_update(  # noqa: PLR0913
+    x: np.ndarray,
+    cov: np.ndarray,
+    C: np.ndarray,
+    R: np.ndarray,
+    z: np.ndarray,
+    eye: np.ndarray,
+    S: np.ndarray,
+    K: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Correct the state estimate and error covariance with a measurement.
+
+    :param x: State estimate
+    :param cov: Error covariance
+    :param C: Observation matrix
+    :param R: Measurement noise covariance
+    :param z: Measurement
+    :param eye: Identity matrix matching the covariance
+    :param S: Innovation covariance scratch buffer
+    :param K: Kalman gain scratch buffer
+    :return: Updated state estimate and error covariance
+    """
+    y = z - C @ x
+    PCt = cov @ C.T
+    np.dot(C, PCt, S)
+    S += R
+    _kalman_gain(PCt, S, K)
+    x = x + K @ y
+
+    # Joseph form keeps the covariance positive definite under roundoff
+    IKC = eye - K @ C
+    cov = IKC @ cov @ IKC.T + K @ R @ K.T
+    return x, (cov + cov.T) / 2
+
+
+def steady_state_covariance(
+    state_space: StateSpaceLinear,
+    process_noise: np.ndarray,
+    measurement_noise: np.ndarray,
+) -> np.ndarray:
+    """Find the updated error covariance the Kalman filter converges to.
+
+    :param state_space: linear state space model
+    :param process_noise: Process noise covariance
+    :param measurement_noise: Measurement noise covariance
+    :return: Steady-state error covariance after a measurement update
+    """
+    A, C = state_space.A, state_space.C
+    cov_pred = solve_discrete_are(A.T, C.T, process_noise, measurement_noise)
+    S = C @ cov_pred @ C.T + measurement_noise
+    cov = cov_pred - cov_pred @ C.T @ np.linalg.solve(S, C @ cov_pred)
+    return symmetrize_matrix(cov)
+
+
+def smoothing_operator(a_i: Elements, a_j: Elements) -> Elements:
+    """Combine two batches of smoothing elements (E, g, L).
+
+    :param a_i: Earlier smoothing elements
+    :param a_j: Later smoothing elements
+    :return: Combined smoothing elements
+    """
+    E_i, g_i, L_i = a_i
+    E_j, g_j, L_j = a_j
+    return E_i @ E_j, E_i @ g_j + g_i, E_i @ L_j @ np.swapaxes(E_i, -1, -2) + L_i
+
+
 class KalmanFilter:
     """Kalman filter implementation."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         state_space: StateSpaceLinear,
         initial_x: np.ndarray,
         initial_covariance: np.ndarray,
         process_noise: Optional[np.ndarray] = None,
         measurement_noise: Optional[np.ndarray] = None,
+        dtype: type = np.float64,
+        specialize: bool = False,
+        history_size: int = 0,
     ) -> None:
         """Initialize the Kalman Filter.
 
@@ -27,30 +226,121 @@ class KalmanFilter:
         :param initial_covariance: Initial error covariance
         :param process_noise: Process noise covariance
         :param measurement_noise: Measurement noise covariance
+        :param dtype: Floating point type used to store the filter arrays
+        :param specialize: Compile a predict step specialized to this model, which
+            is faster per step but costs a compilation for every filter
+        :param history_size: Number of most recent updated estimates to keep
         :return: None
         """
+        self.dtype = dtype
         self.state_space = state_space
         if process_noise is None:
             process_noise = PROCESS_NOISE * np.eye(len(state_space.A))
-        self.Q: np.ndarray = process_noise
+        self.Q: np.ndarray = np.ascontiguousarray(process_noise, dtype=dtype)
 
         if measurement_noise is None:
             measurement_noise = MEASUREMENT_NOISE * np.eye(len(state_space.C))
-        self.R: np.ndarray = measurement_noise
-        self.x: np.ndarray = initial_x
-        self.cov: np.ndarray = initial_covariance
+        self.R: np.ndarray = np.ascontiguousarray(measurement_noise, dtype=dtype)
+        self.x: np.ndarray = np.ascontiguousarray(initial_x, dtype=dtype)
+        self.cov: np.ndarray = np.ascontiguousarray(initial_covariance, dtype=dtype)
+
+        # cast the model once so the compiled kernels see a single signature
+        self._A = np.ascontiguousarray(state_space.A, dtype=dtype)
+        self._B = np.ascontiguousarray(state_space.B, dtype=dtype)
+        self._C = np.ascontiguousarray(state_space.C, dtype=dtype)
+
+        self._check_dimensions()
+
+        self._predict_step: Optional[Callable] = None
+        if specialize:
+            self._predict_step = _make_predict_step(self._A, self._B, self.Q)
+
+        # reused by every update instead of being reallocated
+        num_states, num_measurements = self._C.shape[1], self._C.shape[0]
+        self._I = np.eye(num_states, dtype=dtype)
+        self._S = np.empty((num_measurements, num_measurements), dtype=dtype)
+        self._K = np.empty((num_states, num_measurements), dtype=dtype)
+        self._u_none = np.zeros((self._B.shape[1], 1), dtype=dtype)
+
+        # ring buffers of the predicted and updated estimates
+        self._hist_x = np.empty((history_size, num_states, 1), dtype=dtype)
+        self._hist_cov = np.empty((history_size, num_states, num_states), dtype=dtype)
+        self._hist_x_pred = np.full_like(self._hist_x, np.nan)
+        self._hist_cov_pred = np.full_like(self._hist_cov, np.nan)
+        self._hist_predicted = np.zeros(history_size, dtype=bool)
+        self._hist_idx = 0
+        self._num_predicts = 0
+
+    def _check_dimensions(self) -> None:
+        """Check that the model, noise, and estimate dimensions agree.
+
+        :return: None
+        """
+        num_states = self._A.shape[0]
+        num_inputs = self._B.shape[1]
+        num_measurements = self._C.shape[0]
+        expected = {
+            "A": (self._A, (num_states, num_states)),
+            "B": (self._B, (num_states, num_inputs)),
+            "C": (self._C, (num_measurements, num_states)),
+            "Q": (self.Q, (num_states, num_states)),
+            "R": (self.R, (num_measurements, num_measurements)),
+            "x": (self.x, (num_states, 1)),
+            "cov": (self.cov, (num_states, num_states)),
+        }
+        for name, (matrix, shape) in expected.items():
+            if matrix.shape != shape:
+                msg = f"{name} must have shape {shape}, but has shape {matrix.shape}."
+                logger.error(msg)
+                raise ValueError(msg)
+
+    @property
+    def A(self) -> np.ndarray:  # noqa: N802
+        """Return the state transition matrix in the filter dtype."""
+        return self._A
+
+    @property
+    def B(self) -> np.ndarray:  # noqa: N802
+        """Return the control input matrix in the filter dtype."""
+        return self._B
+
+    @property
+    def C(self) -> np.ndarray:  # noqa: N802
+        """Return the observation matrix in the filter dtype."""
+        return self._C
+
+    @property
+    def history(self) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Return views of the stored (state, covariance) pairs, oldest first."""
+        return [(self._hist_x[idx], self._hist_cov[idx]) for idx in self._hist_order()]
+
+    def _hist_order(self) -> np.ndarray:
+        """Return the ring buffer slots of the stored history, oldest first."""
+        history_size = len(self._hist_x)
+        start = max(self._hist_idx - history_size, 0)
+        return np.arange(start, self._hist_idx) % max(history_size, 1)
 
     def predict(self, u: Optional[np.ndarray] = None) -> None:
         """Predict the next state and error covariance.
 
         :param u: Control input
         """
-        if u is None:
-            u = np.zeros((self.state_space.B.shape[1], 1))
+        # without a control input the kernels skip B @ u entirely
+        has_control = u is not None
+        u = np.ascontiguousarray(u, dtype=self.dtype) if has_control else self._u_none
 
-        self.x = self.state_space.step(x=self.x, u=u)
-        self.cov = self.state_space.A @ self.cov @ self.state_space.A.T + self.Q
-        self.cov = symmetrize_matrix(self.cov)
+        if self._predict_step is None:
+            self.x, self.cov = _kf_predict(
+                self.x, self.cov, self._A, self._B, self.Q, u, has_control
+            )
+        else:
+            self.x, self.cov = self._predict_step(self.x, self.cov, u, has_control)
+
+        history_size = len(self._hist_x)
+        if history_size > 0:
+            self._hist_x_pred[self._hist_idx % history_size] = self.x
+            self._hist_cov_pred[self._hist_idx % history_size] = self.cov
+            self._num_predicts += 1
 
     def update(self, z: np.ndarray) -> None:
         """Update the state estimate with measurement z.
@@ -58,9 +348,56 @@ class KalmanFilter:
         :param z: Measurement
         :return: Updated state estimate and state covariance
         """
-        y = z - self.state_space.C @ self.x
-        S = self.state_space.C @ self.cov @ self.state_space.C.T + self.R
-        K = self.cov @ self.state_space.C.T @ np.linalg.inv(S)
-        self.x = self.x + K @ y
-        cov = (np.eye(self.cov.shape[0]) - K @ self.state_space.C) @ self.cov
-        self.cov = symmetrize_matrix(cov)
+        z = np.ascontiguousarray(z, dtype=self.dtype)
+        self.x, self.cov = _kf_update(
+            self.x, self.cov, self._C, self.R, z, self._I, self._S, self._K
+        )
+
+        history_size = len(self._hist_x)
+        if history_size > 0:
+            self._hist_x[self._hist_idx % history_size] = self.x
+            self._hist_cov[self._hist_idx % history_size] = self.cov
+            # the smoother pairs each update with exactly one preceding predict
+            self._hist_predicted[self._hist_idx % history_size] = (
+                self._num_predicts == 1
+            )
+            self._hist_idx += 1
+            self._num_predicts = 0
+
+    def smooth(self) -> tuple[np.ndarray, np.ndarray]:
+        """Run a Rauch-Tung-Striebel smoother over the stored history.
+
+        The gains for every step are found with one batched solve, and the
+        backward recursion is evaluated as a reversed associative scan.
+
+        :return: Smoothed states and covariances, oldest first
+        """
+        order = self._hist_order()
+        if len(order) == 0:
+            msg = "No history to smooth. Set history_size and run the filter first."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        if not np.all(self._hist_predicted[order[1:]]):
+            msg = "Smoothing requires exactly one predict before each stored update."
+            logger.error(msg)
+            raise ValueError(msg)
+
+        x, cov = self._hist_x[order], self._hist_cov[order]
+        x_pred, cov_pred = self._hist_x_pred[order[1:]], self._hist_cov_pred[order[1:]]
+
+        # G_k = P_k A^T (P_k+1|k)^-1 for all steps at once
+        gains = np.swapaxes(np.linalg.solve(cov_pred, self._A @ cov[:-1]), -1, -2)
+        gains_t = np.swapaxes(gains, -1, -2)
+
+        # the last element starts the backward pass from the filtered estimate
+        E = np.concatenate((gains, np.zeros_like(cov[-1:])))
+        g = np.concatenate((x[:-1] - gains @ x_pred, x[-1:]))
+        L = np.concatenate((cov[:-1] - gains @ cov_pred @ gains_t, cov[-1:]))
+
+        _, states, covariances = parallel_scan(
+            (E[::-1], g[::-1], L[::-1]),
+            lambda later, earlier: smoothing_operator(earlier, later),
+        )
+        states, covariances = states[::-1], covariances[::-1]
+        return states, symmetrize_matrices(covariances)
@@ -3,6 +3,7 @@
 from typing import Any, Callable, Optional
 
 import numpy as np
+from scipy import sparse
 
 from config.definitions import DEFAULT_CONTROL
 from ekf_slam_3d.modules.math_utils import symmetrize_matrix
@@ -33,6 +34,7 @@ class ExtendedKalmanFilter:
         self.cov: np.ndarray = initial_covariance
         self.Q: np.ndarray = process_noise
         self.measurement_noise = measurement_noise
+        self._sparse_threshold = 50
 
     def predict(self, u: np.ndarray = DEFAULT_CONTROL) -> None:
         """Predict the next state and error covariance.
@@ -63,18 +65,13 @@ class ExtendedKalmanFilter:
         :param measurement_args: Additional arguments (e.g., map of features)
         :return: Updated state estimate and state covariance
         """
-        A, B = self.state_space_nonlinear.linearize(
-            model=self.state_space_nonlinear.motion_model,
-            x=self.x,
-            u=u,
-        )
-        C, D = self.state_space_nonlinear.linearize(
+        # only the measurement Jacobian is needed, the motion model is not used
+        C, _ = self.state_space_nonlinear.linearize(
             model=sensor,
             x=self.x,
             u=u,
             other_args=measurement_args,
         )
-        state_space = StateSpaceLinear(A, B, C, D)
 
         predict_z = (
             sensor(self.x)
@@ -83,8 +80,43 @@ class ExtendedKalmanFilter:
         )
 
         R = self.measurement_noise * np.eye(len(z))
-        S = state_space.C @ self.cov @ state_space.C.T + R
-        K = self.cov @ state_space.C.T @ np.linalg.inv(S)
-        self.x = self.x + K @ (z - predict_z)
-        cov = (np.eye(self.cov.shape[0]) - K @ state_space.C) @ self.cov
-        self.cov = symmetrize_matrix(cov)
+        self._correct(innovation=z - predict_z, H=C, R=R)
+
+    def update_batch(
+        self,
+        z_stack: np.ndarray,
+        predict_z: np.ndarray,
+        H_stack: np.ndarray,
+        R_block: np.ndarray,
+    ) -> None:
+        """Update the state estimate with a stack of independent measurements.
+
+        :param z_stack: Stacked measurements
+        :param predict_z: Stacked measurements predicted from the current state
+        :param H_stack: Stacked measurement Jacobians
+        :param R_block: Block-diagonal measurement noise covariance
+        :return: None
+        """
+        self._correct(innovation=z_stack - predict_z, H=H_stack, R=R_block)
+
+    def _correct(
+        self, innovation: np.ndarray, H: np.ndarray | sparse.sparray, R: np.ndarray
+    ) -> None:
+        """Apply the measurement correction to the state and covariance.
+
+        Above the sparse threshold the measurement Jacobian is stored in CSR
+        format, so its products with the covariance scale with the number of
+        non-zero entries. The covariance and innovation covariance stay dense.
+
+        :param innovation: Measurement minus the predicted measurement
+        :param H: Measurement Jacobian, dense or sparse
+        :param R: Measurement noise covariance
+        :return: None
+        """
+        if self.cov.shape[0] > self._sparse_threshold:
+            H = sparse.csr_array(H)
+        HP = np.asarray(H @ self.cov)
+        S = np.asarray(H @ HP.T) + R
+        K = np.linalg.solve(S, HP).T
+        self.x = self.x + K @ innovation
+        self.cov = symmetrize_matrix(self.cov - K @ HP)
@@ -0,0 +1,102 @@
+"""Basic docstring for my module."""
+
+import numpy as np
+
+from ekf_slam_3d.modules.kalman import KalmanFilter
+from ekf_slam_3d.modules.math_utils import (
+    Elements,
+    parallel_scan,
+    symmetrize_matrices,
+)
+
+
+def _transpose(matrix: np.ndarray) -> np.ndarray:
+    """Transpose the last two axes of a stack of matrices."""
+    return np.swapaxes(matrix, -1, -2)
+
+
+def filtering_operator(a_i: Elements, a_j: Elements) -> Elements:
+    """Combine two batches of filtering elements (A, b, C, eta, J).
+
+    :param a_i: Earlier filtering elements
+    :param a_j: Later filtering elements
+    :return: Combined filtering elements
+    """
+    A_i, b_i, C_i, eta_i, J_i = a_i
+    A_j, b_j, C_j, eta_j, J_j = a_j
+    eye = np.eye(A_i.shape[-1], dtype=A_i.dtype)
+
+    # A_j (I + C_i J_j)^-1 and A_i^T (I + J_j C_i)^-1 without forming the inverses
+    W = _transpose(np.linalg.solve(_transpose(eye + C_i @ J_j), _transpose(A_j)))
+    V = _transpose(np.linalg.solve(_transpose(eye + J_j @ C_i), A_i))
+
+    A = W @ A_i
+    b = W @ (b_i + C_i @ eta_j) + b_j
+    C = W @ C_i @ _transpose(A_j) + C_j
+    eta = V @ (eta_j - J_j @ b_i) + eta_i
+    J = V @ J_j @ A_i + J_i
+    return A, b, C, eta, J
+
+
+def filtering_elements(
+    kf: KalmanFilter, controls: np.ndarray, measurements: np.ndarray
+) -> Elements:
+    """Build the filtering elements for a linear time-invariant model.
+
+    :param kf: Kalman filter holding the model, noise, and initial estimate
+    :param controls: Control inputs with shape (T, num_inputs, 1)
+    :param measurements: Measurements with shape (T, num_measurements, 1)
+    :return: Filtering elements (A, b, C, eta, J) with time as the first axis
+    """
+    # use the same cast model as the filter's own predict and update
+    A, B, C = kf.A, kf.B, kf.C
+    Q, R = kf.Q, kf.R
+    controls = np.asarray(controls, dtype=kf.dtype)
+    measurements = np.asarray(measurements, dtype=kf.dtype)
+    num_steps, num_states = len(measurements), A.shape[0]
+    eye = np.eye(num_states, dtype=kf.dtype)
+
+    # only b and eta vary with time since the model is time-invariant
+    Bu = B @ controls
+    S = C @ Q @ C.T + R
+    K = np.linalg.solve(S, C @ Q).T
+    innovation = measurements - C @ Bu
+    HtSinv = np.linalg.solve(S, C).T
+
+    elem_A = np.broadcast_to((eye - K @ C) @ A, (num_steps, num_states, num_states))
+    elem_b = Bu + K @ innovation
+    elem_C = np.broadcast_to((eye - K @ C) @ Q, (num_steps, num_states, num_states))
+    elem_eta = A.T @ HtSinv @ innovation
+    elem_J = np.broadcast_to(A.T @ HtSinv @ C @ A, (num_steps, num_states, num_states))
+    elem_A, elem_C, elem_J = np.copy(elem_A), np.copy(elem_C), np.copy(elem_J)
+
+    # the first element absorbs the prior
+    x_pred = A @ kf.x + Bu[0]
+    cov_pred = A @ kf.cov @ A.T + Q
+    S_1 = C @ cov_pred @ C.T + R
+    K_1 = np.linalg.solve(S_1, C @ cov_pred).T
+    elem_A[0] = 0.0
+    elem_b[0] = x_pred + K_1 @ (measurements[0] - C @ x_pred)
+    elem_C[0] = cov_pred - K_1 @ S_1 @ K_1.T
+    elem_eta[0] = 0.0
+    elem_J[0] = 0.0
+
+    return elem_A, elem_b, elem_C, elem_eta, elem_J
+
+
+def parallel_kalman_filter(
+    kf: KalmanFilter, controls: np.ndarray, measurements: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Filter a whole trajectory with an associative parallel scan.
+
+    This gives the same estimates as calling predict and update once per step,
+    but it requires the controls to be known up front.
+
+    :param kf: Kalman filter holding the model, noise, and initial estimate
+    :param controls: Control inputs with shape (T, num_inputs, 1)
+    :param measurements: Measurements with shape (T, num_measurements, 1)
+    :return: Filtered states (T, num_states, 1) and covariances (T, n, n)
+    """
+    elements = filtering_elements(kf=kf, controls=controls, measurements=measurements)
+    _, states, covariances, _, _ = parallel_scan(elements, filtering_operator)
+    return states, symmetrize_matrices(covariances)
@@ -1,5 +1,7 @@
 """Add a doc string to my files."""
 
+from typing import Callable
+
 import numpy as np
 import scipy
 from loguru import logger
@@ -9,6 +11,8 @@ from sympy import Matrix
 
 from config.definitions import EULER_ORDER, GRAVITY_ACCEL
 
+Elements = tuple[np.ndarray, ...]
+
 
 def skew_matrix(vector: np.ndarray) -> np.ndarray:
     """Calculate the skew symmetric matrix from a given vector.
@@ -126,6 +130,47 @@ def symmetrize_matrix(matrix: np.ndarray) -> np.ndarray:
     return (matrix + matrix.T) / 2
 
 
+def symmetrize_matrices(matrices: np.ndarray) -> np.ndarray:
+    """Symmetrize a stack of matrices.
+
+    :param matrices: Square matrices stacked along the leading axes.
+    """
+    if np.shape(matrices)[-1] != np.shape(matrices)[-2]:
+        dim = matrices.shape
+        msg = f"Input matrices must be square. Matrices have dimensions: {dim[-2]}x{dim[-1]}."
+        logger.error(msg)
+        raise ValueError(msg)
+
+    return (matrices + np.swapaxes(matrices, -1, -2)) / 2
+
+
+def parallel_scan(
+    elements: Elements, op: Callable[[Elements, Elements], Elements]
+) -> Elements:
+    """Compute all prefix combinations of an associative operator.
+
+    Every pass combines each element with the one `offset` steps before it, so
+    the scan finishes in log2(T) vectorized passes instead of T sequential ones.
+
+    :param elements: Tuple of arrays whose first axis indexes time
+    :param op: Associative operator combining two batches of elements
+    :return: Tuple of arrays holding the prefix combinations
+    """
+    result = tuple(np.copy(element) for element in elements)
+    num_elements = result[0].shape[0]
+    offset = 1
+    while offset < num_elements:
+        left = tuple(element[:-offset] for element in result)
+        right = tuple(element[offset:] for element in result)
+        combined = op(left, right)
+        result = tuple(
+            np.concatenate((element[:offset], new))
+            for element, new in zip(result, combined, strict=True)
+        )
+        offset *= 2
+    return result
+
+
 def apply_angular_velocity(
     matrix: np.ndarray, omegas: np.ndarray, dt: float
 ) -> np.ndarray:
@@ -63,6 +63,7 @@ class SlamSimulator:
         self.history: list[tuple[SE3, SE3]] = []
         self.map: Map = sim_map
         self.last_measurement: np.ndarray = np.array([])
+        self.measurement_points: list[np.ndarray] = []
         self.time_stamps: np.ndarray = np.arange(
             start=0.0, stop=20000 / DELTA_T, step=DELTA_T
         )
@@ -77,8 +78,7 @@ class SlamSimulator:
         plt.xlabel("x position")
         plt.ylabel("y position")
         plt.title("Robot Localization")
-        for feature in self.map.features:
-            ax.plot(feature.x, feature.y, "k*")
+        ax.plot(self.map.xs, self.map.ys, "k*")
         self.sim_plot: tuple[Figure, Axes] = (fig, ax)
 
     def step(self, u: np.ndarray) -> SE3:
@@ -98,9 +98,22 @@ class SlamSimulator:
         measurement: np.ndarray,
         show_plot: bool = True,
     ) -> None:
-        """Update the state estimate based on an estimated pose."""
+        """Update the state estimate based on an estimated pose.
+
+        :param estimate: Estimated pose and covariance
+        :param measurement: Latest sensor measurement
+        :param show_plot: Whether to animate this step, use plot_trajectory
+            to draw the whole run at once instead
+        :return: None
+        """
         pose, cov = estimate
         self.history.append((pose, self.pose))
+        if measurement.size > 0 and not np.array_equal(
+            self.last_measurement, measurement
+        ):
+            self.measurement_points.append(
+                self._measurement_endpoints(pose=pose, measurement=measurement)
+            )
 
         old_poses = []
         for old_pose, _ in self.history[-20:]:
@@ -117,13 +130,50 @@ class SlamSimulator:
                 )
             plot_items.append(self.plot_covariance(pose=pose, covariance=cov))
             plot_items.extend(self.plot_measurement(pose=pose, measurement=measurement))
-            self.last_measurement = measurement
             plt.axis("equal")
             plt.pause(PAUSE_TIME)
 
             # remove the sensor measurements
             for item in plot_items:
                 item.remove()
+        self.last_measurement = measurement
+
+    def plot_trajectory(self) -> None:  # pragma: no cover
+        """Draw the whole run in a single pass after the simulation loop.
+
+        :return: None
+        """
+        _, ax = self.sim_plot
+        estimates = np.array([(est.x, est.y) for est, _ in self.history])
+        truths = np.array([(true.x, true.y) for _, true in self.history])
+        ax.plot(truths[:, 0], truths[:, 1], "r-", label="true", alpha=PLOT_ALPHA)
+        ax.plot(
+            estimates[:, 0], estimates[:, 1], "b--", label="estimate", alpha=PLOT_ALPHA
+        )
+        if len(self.measurement_points) > 0:
+            points = np.concatenate(self.measurement_points)
+            ax.scatter(points[:, 0], points[:, 1], s=4, c="k", alpha=0.2)
+        ax.legend()
+        plt.axis("equal")
+        plt.show()
+        plt.close()
+
+    @staticmethod
+    def _measurement_endpoints(pose: SE3, measurement: np.ndarray) -> np.ndarray:
+        """Project distance and azimuth measurements onto the xy-plane.
+
+        :param pose: Pose the measurements were taken from
+        :param measurement: Stacked distance, azimuth, elevation measurements
+        :return: Measured feature locations with shape (N, 2)
+        """
+        distance = measurement[0::3, 0]
+        azimuth = measurement[1::3, 0]
+        return np.column_stack(
+            (
+                pose.x + distance * np.cos(pose.yaw + azimuth),
+                pose.y + distance * np.sin(pose.yaw + azimuth),
+            )
+        )
 
     def plot_covariance(self, pose: SE3, covariance: np.ndarray) -> Patch:
         """Add a drawing of the robot covariance to the plot."""
@@ -152,14 +202,9 @@ class SlamSimulator:
         if not np.array_equal(self.last_measurement, measurement):
             fig, ax = self.sim_plot
             rays = []
-            distance = measurement[0::3, 0]
-            azimuth = measurement[1::3, 0]
-            elevation = measurement[2::3, 0]
-            dae = zip(distance, azimuth, elevation)
-            for dist, azi, _ in dae:
-                x1, x2 = pose.x, pose.x + dist * np.cos(pose.yaw + azi)
-                y1, y2 = pose.y, pose.y + dist * np.sin(pose.yaw + azi)
-                (m,) = ax.plot([x1, x2], [y1, y2], "k-", alpha=0.2)
+            endpoints = self._measurement_endpoints(pose=pose, measurement=measurement)
+            for x2, y2 in endpoints:
+                (m,) = ax.plot([pose.x, x2], [pose.y, y2], "k-", alpha=0.2)
                 rays.append(m)
             return rays
         return rays
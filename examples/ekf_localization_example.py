@@ -11,7 +11,11 @@ from config.definitions import (
 )
 from ekf_slam_3d.data_classes.lie_algebra import SE3, state_to_se3
 from ekf_slam_3d.data_classes.map import make_random_map_planar
-from ekf_slam_3d.data_classes.sensors import Sensor, step_dynamics
+from ekf_slam_3d.data_classes.sensors import (
+    Sensor,
+    jacobian_distance_azimuth_elevation,
+    step_dynamics,
+)
 from ekf_slam_3d.data_classes.slam import PoseMap
 from ekf_slam_3d.modules.kalman_extended import ExtendedKalmanFilter
 from ekf_slam_3d.modules.simulators import SlamSimulator
@@ -43,28 +47,30 @@ def pipeline(show_plot: bool) -> None:
         sim_map=make_random_map_planar(num_features=10, dim=(40, 40)),
     )
 
-    i = 0
-    for time in sim.time_stamps:
-        control_input = np.array([[1.0], [2 * np.pi / 100]])
+    # the control input is constant, so build it once outside the loop
+    control_input = np.array([[1.0], [2 * np.pi / 100]])
+    for step in range(len(sim.time_stamps)):
         sim.step(u=control_input)
         ekf.predict(u=control_input)
         pose_map.pose = SE3(xyz=ekf.x[0:3, 0], roll_pitch_yaw=ekf.x[3:6, 0])
 
         # update the state estimate with the measurements
-        frac, whole = np.modf(time)
-        if whole % 3 == 0 and time > 0.0:
+        if step != 0 and step % 3 == 0:
             # TODO - update the heading with the magnetometer
             ekf.x[5, 0] = sim.pose.yaw + np.random.normal(0, 0.1)
 
-        if whole % 15 == 0 and time > 0.0:
+        if step != 0 and step % 15 == 0:
+            features = sim.map.features
             meas = Sensor.DIST_AZI_ELE.func(
-                state=sim.pose.as_vector(), features=sim.map.features
+                state=sim.pose.as_vector(), features=features
             )
-            ekf.update(
-                z=meas,
-                sensor=Sensor.DIST_AZI_ELE.func,
-                u=control_input,
-                measurement_args=sim.map.features,
+            ekf.update_batch(
+                z_stack=meas,
+                predict_z=Sensor.DIST_AZI_ELE.func(state=ekf.x, features=features),
+                H_stack=jacobian_distance_azimuth_elevation(
+                    state=ekf.x, features_xyz=sim.map.features_xyz()
+                ),
+                R_block=np.kron(np.eye(len(features)), MEASUREMENT_NOISE * np.eye(3)),
             )
 
         # save new features to the map
@@ -75,13 +81,16 @@ def pipeline(show_plot: bool) -> None:
         sim.append_result(
             estimate=(state_to_se3(state=ekf.x), ekf.cov),
             measurement=meas,
-            show_plot=show_plot,
+            show_plot=False,
         )
 
         if show_plot:
             x_str = np.array2string(ekf.x.T, precision=LOG_DECIMALS, floatmode="fixed")
             logger.info(f"state: {x_str}")
-        i += 1
+
+    # draw the whole run once instead of redrawing every step
+    if show_plot:
+        sim.plot_trajectory()
 
 
 if __name__ == "__main__":
@@ -1,20 +1,24 @@
 """Basic docstring for my module."""
 
+import argparse
+import itertools
+import multiprocessing
 from typing import Optional
 
 import numpy as np
 from loguru import logger
-from src.data_classes.state_history import StateHistory, plot_history
-from src.modules.controller import full_state_feedback, get_control_input
-from src.modules.kalman import KalmanFilter
-from src.modules.simulators import (
-    mass_spring_damper_model,
-)
-from src.modules.state_space import StateSpaceLinear
 
 from config.definitions import (
     DEFAULT_DISCRETIZATION,
 )
+from ekf_slam_3d.data_classes.state_history import StateHistory, plot_history
+from ekf_slam_3d.modules.controller import full_state_feedback, get_control_input
+from ekf_slam_3d.modules.kalman import KalmanFilter, steady_state_covariance
+from ekf_slam_3d.modules.kalman_parallel import parallel_kalman_filter
+from ekf_slam_3d.modules.simulators import (
+    mass_spring_damper_model,
+)
+from ekf_slam_3d.modules.state_space import StateSpaceLinear
 
 
 class KalmanSimulator:
@@ -67,10 +71,16 @@ class KalmanSimulator:
         return self.C @ self.x + noise
 
 
-def pipeline() -> None:
-    """Pipeline to run the repo code."""
-    logger.info("Running Kalman Filter pipeline...")
+def _setup_pipeline(
+    process_noise_scale: float, measurement_noise_scale: float, keep_history: bool
+) -> tuple[list[float], np.ndarray, np.ndarray, KalmanFilter, KalmanSimulator]:
+    """Build the model, controller, Kalman filter, and simulator shared by pipelines.
 
+    :param process_noise_scale: Scale of the process noise covariance
+    :param measurement_noise_scale: Scale of the measurement noise covariance
+    :param keep_history: Whether the filter keeps every step for smoothing
+    :return: Time stamps, control gains, desired state, filter, and simulator
+    """
     dt = DEFAULT_DISCRETIZATION
     time = np.arange(0, 10, dt).tolist()
     ss = mass_spring_damper_model(discretization_dt=dt)
@@ -80,13 +90,16 @@ def pipeline() -> None:
     gain_matrix = full_state_feedback(ss, desired_eigenvalues)
     desired_state = np.array([[0], [0]])
 
-    # initialize the kalman filter
+    # initialize the kalman filter at its steady-state covariance
+    Q = process_noise_scale * np.eye(len(ss.A))
+    R = measurement_noise_scale * np.eye(len(ss.C))
     kf = KalmanFilter(
         state_space=ss,
-        process_noise=0.1 * np.eye(len(ss.A)),
-        measurement_noise=1.0 * np.eye(len(ss.C)),
+        process_noise=Q,
+        measurement_noise=R,
         initial_x=np.array([[5.0], [5.0]]),
-        initial_covariance=10 * np.eye(len(ss.A)),
+        initial_covariance=steady_state_covariance(ss, Q, R),
+        history_size=len(time) if keep_history else 0,
     )
 
     sim = KalmanSimulator(
@@ -95,15 +108,43 @@ def pipeline() -> None:
         measurement_noise=kf.R,
         initial_state=kf.x,
     )
+    return time, gain_matrix, desired_state, kf, sim
+
+
+def pipeline(
+    process_noise_scale: float = 0.1,
+    measurement_noise_scale: float = 1.0,
+    seed: Optional[int] = None,
+    show_plot: bool = True,
+) -> StateHistory:
+    """Pipeline to run the repo code.
+
+    :param process_noise_scale: Scale of the process noise covariance
+    :param measurement_noise_scale: Scale of the measurement noise covariance
+    :param seed: Optional seed for the random number generator
+    :param show_plot: Whether to plot the state history
+    :return: State history object
+    """
+    logger.info("Running Kalman Filter pipeline...")
+    if seed is not None:
+        np.random.seed(seed)
+
+    time, gain_matrix, desired_state, kf, sim = _setup_pipeline(
+        process_noise_scale=process_noise_scale,
+        measurement_noise_scale=measurement_noise_scale,
+        keep_history=True,
+    )
 
-    sim_history = StateHistory()
+    sim_history = StateHistory.preallocate(
+        num_steps=len(time), num_states=kf.A.shape[0], num_inputs=kf.B.shape[1]
+    )
 
     # Generate control inputs, measurements, and update the Kalman filter
-    for t in time:
+    for idx, t in enumerate(time):
         u = get_control_input(x=kf.x, desired=desired_state, gain_matrix=gain_matrix)
 
         # Store the updated state for plotting
-        sim_history.append_step(t=t, x=kf.x, cov=kf.cov, u=u, x_truth=sim.x)
+        sim_history.set_step(idx=idx, t=t, x=kf.x, cov=kf.cov, u=u, x_truth=sim.x)
 
         # Simulate the system
         sim.step(u=u)
@@ -113,8 +154,112 @@ def pipeline() -> None:
         kf.predict(u=u)
         kf.update(z=measurement)
 
-    plot_history(history=sim_history)
+    # the filter history starts one step after the stored estimates
+    smoothed_states, _ = kf.smooth()
+    sim_history.state_smoothed = np.full_like(sim_history.state, np.nan)
+    sim_history.state_smoothed[1:] = smoothed_states[:-1]
+
+    if show_plot:
+        plot_history(history=sim_history)
+    return sim_history
+
+
+def sweep(
+    process_noise_scales: tuple[float, ...] = (0.01, 0.1, 1.0),
+    measurement_noise_scales: tuple[float, ...] = (0.1, 1.0, 10.0),
+    seed: int = 0,
+) -> list[StateHistory]:
+    """Run the Kalman filter pipeline over a grid of noise settings in parallel.
+
+    :param process_noise_scales: Process noise covariance scales to try
+    :param measurement_noise_scales: Measurement noise covariance scales to try
+    :param seed: Base seed, offset by the grid index for each run
+    :return: State history of each run in grid order
+    """
+    grid = [
+        (q_scale, r_scale, seed + idx, False)
+        for idx, (q_scale, r_scale) in enumerate(
+            itertools.product(process_noise_scales, measurement_noise_scales)
+        )
+    ]
+    with multiprocessing.Pool() as pool:
+        histories = pool.starmap(pipeline, grid)
+
+    for (q_scale, r_scale, _, _), history in zip(grid, histories, strict=True):
+        error = np.asarray(history.state) - np.asarray(history.state_true)
+        rms = np.sqrt(np.mean(error**2))
+        logger.info(f"Q scale: {q_scale}, R scale: {r_scale}, RMS error: {rms:.3f}")
+    return histories
+
+
+def pipeline_parallel(
+    process_noise_scale: float = 0.1,
+    measurement_noise_scale: float = 1.0,
+    seed: Optional[int] = None,
+    show_plot: bool = True,
+) -> StateHistory:
+    """Pipeline to filter a whole simulated run with a parallel scan.
+
+    :param process_noise_scale: Scale of the process noise covariance
+    :param measurement_noise_scale: Scale of the measurement noise covariance
+    :param seed: Optional seed for the random number generator
+    :param show_plot: Whether to plot the state history
+    :return: State history object
+    """
+    logger.info("Running parallel Kalman Filter pipeline...")
+    if seed is not None:
+        np.random.seed(seed)
+
+    time, gain_matrix, desired_state, kf, sim = _setup_pipeline(
+        process_noise_scale=process_noise_scale,
+        measurement_noise_scale=measurement_noise_scale,
+        keep_history=False,
+    )
+
+    # the scan needs every control input up front, so close the loop on the truth
+    controls, measurements, states_true = [], [], []
+    for _t in time:
+        u = get_control_input(x=sim.x, desired=desired_state, gain_matrix=gain_matrix)
+        states_true.append(sim.x)
+        controls.append(u)
+        sim.step(u=u)
+        measurements.append(sim.get_measurement())
+
+    states, covariances = parallel_kalman_filter(
+        kf=kf, controls=np.array(controls), measurements=np.array(measurements)
+    )
+
+    # Store the estimate before each step for plotting
+    sim_history = StateHistory(
+        time=np.array(time),
+        state=np.concatenate(([kf.x], states[:-1])),
+        state_true=np.array(states_true),
+        control=np.array(controls),
+        covariance=np.concatenate(([kf.cov], covariances[:-1])),
+    )
+
+    if show_plot:
+        plot_history(history=sim_history)
+    return sim_history
 
 
 if __name__ == "__main__":
-    pipeline()
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Filter the whole run with a parallel scan instead of step by step",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Run the filter over a grid of noise settings across processes",
+    )
+    args = parser.parse_args()
+
+    if args.parallel:
+        pipeline_parallel()
+    elif args.sweep:
+        sweep()
+    else:
+        pipeline()
@@ -22,7 +22,7 @@ def test_map_creation() -> None:
     map_object.append_feature(Feature(id=3, x=2, y=2))
 
     # Assert
-    assert map_object.features == map_features
+    assert map_object.features == [*map_features, Feature(id=3, x=2, y=2)]
 
 
 @pytest.mark.parametrize(("x", "y"), [(2, 3), (3, 4)])
@@ -65,6 +65,29 @@ def test_map_random():
     assert len(map_object.features) == num_features
 
 
+def test_map_add_features() -> None:
+    """Test that features are added in bulk and revisited ids are skipped."""
+    # Arrange
+    map_object = Map(features=[Feature(id=0, x=1.0, y=1.0)])
+
+    # Act
+    map_object.add_features(
+        ids=np.array([0, 1, 2]),
+        xs=np.array([5.0, 2.0, 3.0]),
+        ys=np.array([5.0, 4.0, 6.0]),
+    )
+
+    # Assert
+    assert len(map_object) == 3
+    assert map_object.past_feature_ids == [0, 1, 2]
+    assert map_object.feature_already_found(Feature(id=2, x=0.0, y=0.0))
+    np.testing.assert_array_equal(map_object.ids, [0, 1, 2])
+    np.testing.assert_array_almost_equal(
+        map_object.features_xyz(),
+        np.array([[1.0, 1.0, 0.0], [2.0, 4.0, 0.0], [3.0, 6.0, 0.0]]),
+    )
+
+
 def test_feature_as_vector():
     """Test that a feature can be created and converted to a vector."""
     # Arrange
@@ -77,3 +100,19 @@ def test_feature_as_vector():
     np.testing.assert_array_almost_equal(
         feature_vector, np.array([[2.0], [3.0], [0.0]])
     )
+
+
+def test_map_box_sides() -> None:
+    """Test that every box map feature lies on the boundary of the map."""
+    # Arrange
+    dim = (10, 20)
+
+    # Act
+    map_object = make_box_map_planar(num_features=8, dim=dim)
+
+    # Assert
+    on_x_side = np.isin(map_object.xs, [0, dim[0]])
+    on_y_side = np.isin(map_object.ys, [0, dim[1]])
+    assert np.all(on_x_side | on_y_side)
+    np.testing.assert_array_equal(map_object.ids, np.arange(8))
+    assert map_object.feature_already_found(Feature(id=7, x=0.0, y=0.0))
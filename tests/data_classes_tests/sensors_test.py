@@ -1 +1,37 @@
 """Add a doc string to my files."""
+
+import numpy as np
+
+from ekf_slam_3d.data_classes.map import make_random_map_planar
+from ekf_slam_3d.data_classes.sensors import (
+    jacobian_distance_azimuth_elevation,
+    measure_distance_azimuth_elevation,
+    step_dynamics,
+)
+from ekf_slam_3d.modules.state_space import StateSpaceNonlinear
+from tests.conftest import TEST_DECIMALS_ACCURACY
+
+
+def test_jacobian_distance_azimuth_elevation() -> None:
+    """Test that the analytic Jacobian matches the numerical linearization."""
+    # Arrange
+    np.random.seed(0)
+    sim_map = make_random_map_planar(num_features=5, dim=(40, 40))
+    state = np.array([[20.0], [-3.0], [0.5], [0.0], [0.1], [0.3]])
+    robot = StateSpaceNonlinear(motion_model=step_dynamics)
+    exp_jacobian, _ = robot.linearize(
+        model=measure_distance_azimuth_elevation,
+        x=state,
+        u=np.zeros((2, 1)),
+        other_args=sim_map.features,
+    )
+
+    # Act
+    jacobian = jacobian_distance_azimuth_elevation(
+        state=state, features_xyz=sim_map.features_xyz()
+    )
+
+    # Assert
+    np.testing.assert_array_almost_equal(
+        jacobian, exp_jacobian, decimal=TEST_DECIMALS_ACCURACY
+    )
@@ -84,6 +84,46 @@ def test_state_space_data_append():
     np.testing.assert_array_almost_equal(data.state_true, [np.array([0.1, 0.2])])
 
 
+def test_state_space_data_preallocated():
+    """Test that a preallocated state history stores results by index."""
+    # Arrange
+    data = StateHistory.preallocate(num_steps=3, num_states=2, num_inputs=1)
+
+    # Act
+    data.set_step(
+        idx=1,
+        t=0.1,
+        x=np.array([[0.1], [0.2]]),
+        cov=np.eye(2),
+        u=np.array([[0.3]]),
+        x_truth=np.array([[0.4], [0.5]]),
+    )
+
+    # Assert
+    assert data.state.shape == (3, 2, 1)
+    np.testing.assert_array_almost_equal(data.time[1], 0.1)
+    np.testing.assert_array_almost_equal(data.state[1], np.array([[0.1], [0.2]]))
+    np.testing.assert_array_almost_equal(data.covariance[1], np.eye(2))
+    np.testing.assert_array_almost_equal(data.control[1], np.array([[0.3]]))
+    np.testing.assert_array_almost_equal(data.state_true[1], np.array([[0.4], [0.5]]))
+
+
+def test_state_space_data_preallocated_optional_fields():
+    """Test that optional data omitted from a preallocated history stays NaN."""
+    # Arrange
+    data = StateHistory.preallocate(num_steps=3, num_states=2, num_inputs=1)
+
+    # Act
+    data.set_step(idx=0, t=0.0, x=np.array([[0.1], [0.2]]))
+
+    # Assert
+    np.testing.assert_array_almost_equal(data.state[0], np.array([[0.1], [0.2]]))
+    assert np.all(np.isnan(data.state[1:]))
+    assert np.all(np.isnan(data.state_true))
+    assert np.all(np.isnan(data.covariance))
+    assert np.all(np.isnan(data.control))
+
+
 def test_state_space_step() -> None:
     """Test that the state space step method works."""
     # Arrange
@@ -0,0 +1,128 @@
+"""Add a doc string to my files."""
+
+import numpy as np
+
+from config.definitions import MEASUREMENT_NOISE, SIGMA_OMEGA, SIGMA_VEL
+from ekf_slam_3d.data_classes.map import make_random_map_planar
+from ekf_slam_3d.data_classes.sensors import (
+    jacobian_distance_azimuth_elevation,
+    measure_distance_azimuth_elevation,
+    measure_gps,
+    step_dynamics,
+)
+from ekf_slam_3d.modules.kalman_extended import ExtendedKalmanFilter
+from ekf_slam_3d.modules.state_space import StateSpaceNonlinear
+from tests.conftest import TEST_DECIMALS_ACCURACY
+
+
+def _make_ekf() -> ExtendedKalmanFilter:
+    """Create an extended Kalman filter for a planar robot."""
+    return ExtendedKalmanFilter(
+        state_space_nonlinear=StateSpaceNonlinear(motion_model=step_dynamics),
+        initial_x=np.zeros((6, 1)),
+        initial_covariance=0.1 * np.eye(6),
+        process_noise=np.array([[SIGMA_VEL, 0], [0, SIGMA_OMEGA]]),
+        measurement_noise=MEASUREMENT_NOISE,
+    )
+
+
+def test_extended_kalman_filter_predict() -> None:
+    """Test that the next state and covariance is predicted correctly."""
+    # Arrange
+    ekf = _make_ekf()
+    u = np.array([[1.0], [0.1]])
+    A, B = ekf.state_space_nonlinear.linearize(
+        model=ekf.state_space_nonlinear.motion_model, x=ekf.x, u=u
+    )
+    exp_x = step_dynamics(np.vstack((ekf.x, u)))
+    exp_cov = A @ ekf.cov @ A.T + B @ ekf.Q @ B.T
+
+    # Act
+    ekf.predict(u=u)
+
+    # Assert
+    np.testing.assert_array_almost_equal(ekf.x, exp_x)
+    np.testing.assert_array_almost_equal(ekf.cov, exp_cov)
+
+
+def test_extended_kalman_filter_update_skips_motion_model() -> None:
+    """Test that the update only linearizes the measurement model."""
+    # Arrange
+    calls = []
+
+    def motion_model(xu: np.ndarray) -> np.ndarray:
+        calls.append(xu)
+        return step_dynamics(xu)
+
+    ekf = _make_ekf()
+    ekf.state_space_nonlinear = StateSpaceNonlinear(motion_model=motion_model)
+    z = measure_gps(state=np.ones((6, 1)), features=[])
+
+    # Act
+    ekf.update(z=z, sensor=measure_gps, u=np.zeros((2, 1)), measurement_args=[])
+
+    # Assert
+    assert len(calls) == 0
+    assert np.all(ekf.x[0:3] > 0.0)
+
+
+def test_extended_kalman_filter_update_batch() -> None:
+    """Test that the stacked update matches the numerically linearized update."""
+    # Arrange
+    np.random.seed(0)
+    features = make_random_map_planar(num_features=4, dim=(40, 40)).features
+    features_xyz = np.array([[f.x, f.y, f.z] for f in features])
+    true_state = np.array([[0.5], [-0.5], [0.0], [0.0], [0.0], [0.1]])
+    z = measure_distance_azimuth_elevation(state=true_state, features=features)
+    u = np.zeros((2, 1))
+    exp_ekf = _make_ekf()
+    exp_ekf.update(
+        z=z, sensor=measure_distance_azimuth_elevation, u=u, measurement_args=features
+    )
+    ekf = _make_ekf()
+
+    # Act
+    ekf.update_batch(
+        z_stack=z,
+        predict_z=measure_distance_azimuth_elevation(state=ekf.x, features=features),
+        H_stack=jacobian_distance_azimuth_elevation(
+            state=ekf.x, features_xyz=features_xyz
+        ),
+        R_block=np.kron(np.eye(len(features)), MEASUREMENT_NOISE * np.eye(3)),
+    )
+
+    # Assert
+    np.testing.assert_array_almost_equal(
+        ekf.x, exp_ekf.x, decimal=TEST_DECIMALS_ACCURACY
+    )
+    np.testing.assert_array_almost_equal(
+        ekf.cov, exp_ekf.cov, decimal=TEST_DECIMALS_ACCURACY
+    )
+
+
+def test_extended_kalman_filter_update_batch_sparse() -> None:
+    """Test that the sparse update of a large state matches the dense equations."""
+    # Arrange
+    np.random.seed(0)
+    num_states, num_measurements = 60, 6
+    ekf = _make_ekf()
+    ekf.x = np.random.randn(num_states, 1)
+    L = np.random.randn(num_states, num_states)
+    ekf.cov = L @ L.T + num_states * np.eye(num_states)
+    H = np.zeros((num_measurements, num_states))
+    H[:, :6] = np.random.randn(num_measurements, 6)
+    R = MEASUREMENT_NOISE * np.eye(num_measurements)
+    z = np.random.randn(num_measurements, 1)
+
+    S = H @ ekf.cov @ H.T + R
+    K = ekf.cov @ H.T @ np.linalg.inv(S)
+    exp_x = ekf.x + K @ (z - H @ ekf.x)
+    exp_cov = (np.eye(num_states) - K @ H) @ ekf.cov
+
+    # Act
+    ekf.update_batch(z_stack=z, predict_z=H @ ekf.x, H_stack=H, R_block=R)
+
+    # Assert
+    np.testing.assert_array_almost_equal(ekf.x, exp_x)
+    np.testing.assert_array_almost_equal(ekf.cov, exp_cov)
+    assert isinstance(ekf.cov, np.ndarray)
@@ -0,0 +1,88 @@
+"""Add a doc string to my files."""
+
+import numpy as np
+import pytest
+
+from ekf_slam_3d.modules.kalman import KalmanFilter
+from ekf_slam_3d.modules.kalman_parallel import parallel_kalman_filter, parallel_scan
+from ekf_slam_3d.modules.simulators import mass_spring_damper_model
+from ekf_slam_3d.modules.state_space import StateSpaceLinear
+from tests.conftest import TEST_DT
+
+
+@pytest.mark.parametrize("num_elements", [1, 2, 7, 16])
+def test_parallel_scan_cumulative_sum(num_elements: int) -> None:
+    """Test that the scan computes all prefix combinations."""
+    # Arrange
+    values = np.arange(num_elements, dtype=float)
+
+    # Act
+    (result,) = parallel_scan((values,), lambda a, b: (a[0] + b[0],))
+
+    # Assert
+    np.testing.assert_array_almost_equal(result, np.cumsum(values))
+
+
+def test_parallel_kalman_filter_matches_sequential() -> None:
+    """Test that the parallel filter matches the sequential Kalman filter."""
+    # Arrange
+    np.random.seed(0)
+    num_steps = 50
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    kf = KalmanFilter(
+        state_space=ss,
+        process_noise=0.1 * np.eye(2),
+        measurement_noise=np.eye(2),
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+    )
+    controls = np.random.normal(size=(num_steps, 1, 1))
+    measurements = np.random.normal(size=(num_steps, 2, 1))
+
+    # Act
+    states, covariances = parallel_kalman_filter(
+        kf=kf, controls=controls, measurements=measurements
+    )
+
+    # Assert
+    for u, z, state, cov in zip(
+        controls, measurements, states, covariances, strict=True
+    ):
+        kf.predict(u=u)
+        kf.update(z=z)
+        np.testing.assert_array_almost_equal(state, kf.x)
+        np.testing.assert_array_almost_equal(cov, kf.cov)
+
+
+def test_parallel_kalman_filter_uses_filter_dtype() -> None:
+    """Test that the parallel filter runs on the filter's cast model."""
+    # Arrange
+    np.random.seed(0)
+    num_steps = 10
+    ss = StateSpaceLinear(A=np.array([[1, 1], [0, 1]]), B=np.array([[0], [1]]))
+    kf = KalmanFilter(
+        state_space=ss,
+        process_noise=0.1 * np.eye(2),
+        measurement_noise=np.eye(2),
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+        dtype=np.float32,
+    )
+    controls = np.random.normal(size=(num_steps, 1, 1))
+    measurements = np.random.normal(size=(num_steps, 2, 1))
+
+    # Act
+    states, covariances = parallel_kalman_filter(
+        kf=kf, controls=controls, measurements=measurements
+    )
+
+    # Assert
+    assert states.dtype == np.float32
+    assert covariances.dtype == np.float32
+    for u, z, state, cov in zip(
+        controls, measurements, states, covariances, strict=True
+    ):
+        kf.predict(u=u)
+        kf.update(z=z)
+        np.testing.assert_allclose(state, kf.x, rtol=1e-4, atol=1e-4)
+        np.testing.assert_allclose(cov, kf.cov, rtol=1e-4, atol=1e-4)
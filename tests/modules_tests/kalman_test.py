@@ -1,10 +1,12 @@
 """Add a doc string to my files."""
 
 import numpy as np
+import pytest
 
 from config.definitions import DEFAULT_VARIANCE, MEASUREMENT_NOISE, PROCESS_NOISE
-from ekf_slam_3d.modules.kalman import KalmanFilter
+from ekf_slam_3d.modules.kalman import KalmanFilter, steady_state_covariance
 from ekf_slam_3d.modules.simulators import mass_spring_damper_model
+from ekf_slam_3d.modules.state_space import StateSpaceLinear
 from tests.conftest import TEST_DECIMALS_ACCURACY, TEST_DT
 
 
@@ -38,7 +40,7 @@ def test_kalman_filter_predict_with_control_input() -> None:
     ss = mass_spring_damper_model(discretization_dt=TEST_DT)
 
     Q = DEFAULT_VARIANCE * np.eye(2)
-    R = DEFAULT_VARIANCE * np.eye(1)
+    R = DEFAULT_VARIANCE * np.eye(2)
     initial_state = np.array([[1.0], [1.0]])
     initial_covariance = np.eye(2)
 
@@ -58,3 +60,312 @@ def test_kalman_filter_predict_with_control_input() -> None:
 
     assert np.allclose(kf.x, expected_next_state, atol=TEST_DECIMALS_ACCURACY)
     assert np.allclose(kf.cov, expected_next_covariance, atol=TEST_DECIMALS_ACCURACY)
+
+
+def test_kalman_filter_update() -> None:
+    """Test that the state and covariance are corrected by a measurement."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    initial_state = np.array([[1.0], [1.0]])
+    initial_covariance = np.eye(2)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=initial_state,
+        initial_covariance=initial_covariance,
+    )
+    z = np.array([[1.5], [0.5]])
+
+    S = ss.C @ initial_covariance @ ss.C.T + kf.R
+    K = initial_covariance @ ss.C.T @ np.linalg.inv(S)
+    exp_x = initial_state + K @ (z - ss.C @ initial_state)
+    exp_cov = (np.eye(2) - K @ ss.C) @ initial_covariance
+
+    # Act
+    kf.update(z=z)
+
+    # Assert
+    np.testing.assert_array_almost_equal(kf.x, exp_x)
+    np.testing.assert_array_almost_equal(kf.cov, exp_cov)
+
+
+@pytest.mark.parametrize("num_measurements", [1, 2, 3])
+def test_kalman_filter_update_measurement_sizes(num_measurements: int) -> None:
+    """Test the update for the closed-form and general gain computations."""
+    # Arrange
+    A = np.eye(3)
+    C = np.eye(3)[:num_measurements]
+    ss = StateSpaceLinear(A=A, C=C)
+    initial_state = np.array([[1.0], [2.0], [3.0]])
+    initial_covariance = np.array([[2.0, 0.5, 0.1], [0.5, 1.0, 0.2], [0.1, 0.2, 3.0]])
+    R = DEFAULT_VARIANCE * np.eye(num_measurements)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=initial_state,
+        initial_covariance=initial_covariance,
+        measurement_noise=R,
+    )
+    z = np.zeros((num_measurements, 1))
+
+    S = C @ initial_covariance @ C.T + R
+    K = initial_covariance @ C.T @ np.linalg.inv(S)
+    exp_x = initial_state + K @ (z - C @ initial_state)
+    exp_cov = (np.eye(3) - K @ C) @ initial_covariance
+
+    # Act
+    kf.update(z=z)
+
+    # Assert
+    np.testing.assert_array_almost_equal(kf.x, exp_x)
+    np.testing.assert_array_almost_equal(kf.cov, exp_cov)
+
+
+def test_kalman_filter_single_precision() -> None:
+    """Test that a float32 filter tracks the float64 filter."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    filters = [
+        KalmanFilter(
+            state_space=ss,
+            initial_x=np.array([[5.0], [5.0]]),
+            initial_covariance=10 * np.eye(2),
+            dtype=dtype,
+        )
+        for dtype in (np.float64, np.float32)
+    ]
+
+    # Act
+    for kf in filters:
+        for _ in range(50):
+            kf.predict(u=np.array([[1.0]]))
+            kf.update(z=np.array([[1.0], [0.0]]))
+
+    # Assert
+    kf64, kf32 = filters
+    assert kf32.x.dtype == np.float32
+    assert kf32.cov.dtype == np.float32
+    np.testing.assert_allclose(kf32.x, kf64.x, rtol=1e-3, atol=1e-5)
+    np.testing.assert_allclose(kf32.cov, kf64.cov, rtol=1e-3, atol=1e-5)
+    assert np.all(np.linalg.eigvalsh(kf32.cov) > 0.0)
+
+
+@pytest.mark.parametrize(
+    "ss",
+    [
+        mass_spring_damper_model(discretization_dt=TEST_DT),
+        StateSpaceLinear(A=np.diag([0.9, 1.1]), B=np.array([[0.0], [4.0]])),
+    ],
+)
+def test_kalman_filter_specialized_predict(ss: StateSpaceLinear) -> None:
+    """Test that the specialized predict step matches the generic one."""
+    # Arrange
+    filters = [
+        KalmanFilter(
+            state_space=ss,
+            initial_x=np.array([[5.0], [5.0]]),
+            initial_covariance=np.array([[10.0, 1.0], [1.0, 5.0]]),
+            specialize=specialize,
+        )
+        for specialize in (False, True)
+    ]
+
+    # Act
+    for kf in filters:
+        for _ in range(10):
+            kf.predict(u=np.array([[1.0]]))
+        kf.predict()
+
+    # Assert
+    generic, specialized = filters
+    np.testing.assert_array_almost_equal(specialized.x, generic.x)
+    np.testing.assert_array_almost_equal(specialized.cov, generic.cov)
+
+
+@pytest.mark.parametrize(("history_size", "num_steps"), [(0, 3), (5, 3), (3, 5)])
+def test_kalman_filter_history(history_size: int, num_steps: int) -> None:
+    """Test that the most recent updated estimates are kept in order."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+        history_size=history_size,
+    )
+
+    # Act
+    estimates = []
+    for step in range(num_steps):
+        kf.predict()
+        kf.update(z=np.array([[float(step)], [0.0]]))
+        estimates.append((kf.x, kf.cov))
+
+    # Assert
+    exp_history = estimates[num_steps - min(history_size, num_steps) :]
+    assert len(kf.history) == len(exp_history)
+    for (x, cov), (exp_x, exp_cov) in zip(kf.history, exp_history, strict=True):
+        np.testing.assert_array_equal(x, exp_x)
+        np.testing.assert_array_equal(cov, exp_cov)
+
+
+@pytest.mark.parametrize("num_measurements", [1, 2, 3])
+def test_kalman_filter_update_singular_innovation(num_measurements: int) -> None:
+    """Test that a singular innovation covariance raises for every gain branch."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    ss = StateSpaceLinear(A=ss.A, B=ss.B, C=np.zeros((num_measurements, 2)))
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=np.eye(2),
+        measurement_noise=np.zeros((num_measurements, num_measurements)),
+    )
+
+    # Act and Assert
+    with pytest.raises(np.linalg.LinAlgError):
+        kf.update(z=np.zeros((num_measurements, 1)))
+
+
+def test_kalman_filter_smooth() -> None:
+    """Test that the smoother matches a sequential Rauch-Tung-Striebel pass."""
+    # Arrange
+    np.random.seed(0)
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+        process_noise=0.1 * np.eye(2),
+        measurement_noise=np.eye(2),
+        history_size=20,
+    )
+    filtered, predicted = [], []
+    for _ in range(20):
+        kf.predict(u=np.random.normal(size=(1, 1)))
+        predicted.append((kf.x, kf.cov))
+        kf.update(z=np.random.normal(size=(2, 1)))
+        filtered.append((kf.x, kf.cov))
+
+    exp_states, exp_covariances = [filtered[-1][0]], [filtered[-1][1]]
+    for (x, cov), (x_pred, cov_pred) in zip(
+        filtered[-2::-1], predicted[:0:-1], strict=True
+    ):
+        gain = cov @ ss.A.T @ np.linalg.inv(cov_pred)
+        exp_states.insert(0, x + gain @ (exp_states[0] - x_pred))
+        exp_covariances.insert(0, cov + gain @ (exp_covariances[0] - cov_pred) @ gain.T)
+
+    # Act
+    states, covariances = kf.smooth()
+
+    # Assert
+    np.testing.assert_array_almost_equal(states, np.array(exp_states))
+    np.testing.assert_array_almost_equal(covariances, np.array(exp_covariances))
+
+
+def test_kalman_filter_smooth_without_history() -> None:
+    """Test that smoothing without a stored history raises an error."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+    )
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        kf.smooth()
+
+
+@pytest.mark.parametrize("num_predicts", [0, 2])
+def test_kalman_filter_smooth_without_single_predict(num_predicts: int) -> None:
+    """Test that smoothing raises if an update did not follow exactly one predict."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[5.0], [5.0]]),
+        initial_covariance=10 * np.eye(2),
+        history_size=5,
+    )
+    for _ in range(4):
+        for _ in range(num_predicts):
+            kf.predict()
+        kf.update(z=np.zeros((2, 1)))
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        kf.smooth()
+
+
+def test_steady_state_covariance() -> None:
+    """Test that the steady-state covariance is a fixed point of the filter."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+    Q = 0.1 * np.eye(2)
+    R = np.eye(2)
+
+    # Act
+    cov = steady_state_covariance(ss, Q, R)
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.zeros((2, 1)),
+        initial_covariance=cov,
+        process_noise=Q,
+        measurement_noise=R,
+    )
+    kf.predict()
+    kf.update(z=np.zeros((2, 1)))
+
+    # Assert
+    np.testing.assert_array_almost_equal(kf.cov, cov)
+
+
+def test_kalman_filter_casts_inputs() -> None:
+    """Test that integer and transposed inputs are stored as contiguous floats."""
+    # Arrange
+    A = np.array([[1, 0], [1, 1]]).T
+    ss = StateSpaceLinear(A=A)
+
+    # Act
+    kf = KalmanFilter(
+        state_space=ss,
+        initial_x=np.array([[1], [2]]),
+        initial_covariance=np.eye(2, dtype=int),
+    )
+
+    # Assert
+    for matrix in (kf.x, kf.cov, kf.Q, kf.R):
+        assert matrix.dtype == np.float64
+        assert matrix.flags.c_contiguous
+    kf.predict()
+    np.testing.assert_array_almost_equal(kf.x, np.array([[3.0], [2.0]]))
+
+
+@pytest.mark.parametrize(
+    ("initial_x", "initial_covariance", "process_noise", "measurement_noise"),
+    [
+        (np.zeros((3, 1)), np.eye(2), None, None),
+        (np.zeros((2, 1)), np.eye(3), None, None),
+        (np.zeros((2, 1)), np.eye(2), np.eye(3), None),
+        (np.zeros((2, 1)), np.eye(2), None, np.eye(1)),
+    ],
+)
+def test_kalman_filter_incorrect_dims(
+    initial_x: np.ndarray,
+    initial_covariance: np.ndarray,
+    process_noise: np.ndarray,
+    measurement_noise: np.ndarray,
+) -> None:
+    """Test that the Kalman filter raises an error for incompatible dimensions."""
+    # Arrange
+    ss = mass_spring_damper_model(discretization_dt=TEST_DT)
+
+    # Act and Assert
+    with pytest.raises(ValueError):
+        KalmanFilter(
+            state_space=ss,
+            initial_x=initial_x,
+            initial_covariance=initial_covariance,
+            process_noise=process_noise,
+            measurement_noise=measurement_noise,
+        )
@@ -3,7 +3,7 @@
 import numpy as np
 import pytest
 
-from ekf_slam_3d.modules.math_utils import matrix_exponential
+from ekf_slam_3d.modules.math_utils import matrix_exponential, symmetrize_matrices
 
 
 @pytest.mark.parametrize("t", [1.0, 0.1, 0.01])
@@ -52,3 +52,26 @@ def test_matrix_exponential_nonsquare() -> None:
     # Act / Assert
     with np.testing.assert_raises(ValueError):
         _ = matrix_exponential(matrix_nonsquare)
+
+
+def test_symmetrize_matrices() -> None:
+    """Test that every matrix in a stack is symmetrized."""
+    # Arrange
+    matrices = np.arange(18, dtype=float).reshape((2, 3, 3))
+
+    # Act
+    result = symmetrize_matrices(matrices)
+
+    # Assert
+    for matrix, sym in zip(matrices, result, strict=True):
+        np.testing.assert_array_almost_equal(sym, (matrix + matrix.T) / 2)
+
+
+def test_symmetrize_matrices_nonsquare() -> None:
+    """Test that a stack of non-square matrices raises an error."""
+    # Arrange
+    matrices = np.ones((2, 3, 2))
+
+    # Act / Assert
+    with np.testing.assert_raises(ValueError):
+        _ = symmetrize_matrices(matrices)